@@ -10,7 +10,7 @@ import os
 import sys
 
 from . import contexts, commands
-from .util import CliException, add_subparser
+from .util import CliException, LazySubparsersAction, add_lazy_subparser
 from ..version import VERSION
 
 
@@ -77,9 +77,9 @@ def make_parser():
                 parser.prog
 
     subcommands = parser.add_subparsers(title=subcommands_desc,
-        description="", help=argparse.SUPPRESS)
+        description="", help=argparse.SUPPRESS, action=LazySubparsersAction)
     for command_name, command, _ in known_contexts + known_commands:
-        add_subparser(subcommands, command_name, command.build_parser)
+        add_lazy_subparser(subcommands, command_name, command.build_parser)
 
     return parser
 
@@ -8,10 +8,6 @@ import logging as log
 import os
 import os.path as osp
 
-from datumaro.components.project import Project
-from datumaro.util.command_targets import (TargetKinds, target_selector,
-    ProjectTarget, SourceTarget, ImageTarget, is_project_path)
-from datumaro.util.image import load_image, save_image
 from ..util import MultilineFormatter
 from ..util.project import load_project
 
@@ -69,6 +65,11 @@ def build_parser(parser_ctor=argparse.ArgumentParser):
     return parser
 
 def explain_command(args):
+    from datumaro.components.project import Project
+    from datumaro.util.command_targets import (TargetKinds, target_selector,
+        ProjectTarget, SourceTarget, ImageTarget, is_project_path)
+    from datumaro.util.image import load_image, save_image
+
     project_path = args.project_dir
     if is_project_path(project_path):
         project = Project.load(project_path)
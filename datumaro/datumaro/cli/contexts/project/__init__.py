@@ -9,21 +9,75 @@ import logging as log
 import os
 import os.path as osp
 import shutil
+import sys
 
-from datumaro.components.project import Project, Environment, \
+from datumaro.components.config_model import \
     PROJECT_DEFAULT_CONFIG as DEFAULT_CONFIG
-from datumaro.components.comparator import Comparator
-from datumaro.components.dataset_filter import DatasetItemEncoder
-from datumaro.components.extractor import AnnotationType
-from datumaro.components.cli_plugin import CliPlugin
-from .diff import DiffVisualizer
-from ...util import add_subparser, CliException, MultilineFormatter, \
-    make_file_name
+from ...util import add_lazy_subparser, CliException, \
+    LazySubparsersAction, MultilineFormatter, make_file_name
 from ...util.project import load_project, generate_next_dir_name
 
 
+def _dir_nonempty(path):
+    try:
+        entries = os.scandir(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+    nonempty = next(entries, None) is not None
+    if hasattr(entries, 'close'): # Python 3.6+
+        entries.close()
+    return nonempty
+
+def _rmtree(path, ignore_errors=False):
+    # NOTE: relies on the entry types cached by scandir() instead of
+    # a stat() call per entry. Anything unusual, like symlinks, junctions
+    # or errors, is left to shutil.rmtree(), which keeps its semantics.
+    if os.name == 'nt' or osp.islink(path):
+        shutil.rmtree(path, ignore_errors=ignore_errors)
+        return
+
+    def _remove_dir(path):
+        for entry in list(os.scandir(path)):
+            if entry.is_dir(follow_symlinks=False):
+                _remove_dir(entry.path)
+            else:
+                os.unlink(entry.path)
+        os.rmdir(path)
+
+    try:
+        _remove_dir(path)
+    except OSError:
+        shutil.rmtree(path, ignore_errors=ignore_errors)
+
+def _check_dst_dir(dst_dir, overwrite=False):
+    if not overwrite and _dir_nonempty(dst_dir):
+        raise CliException("Directory '%s' already exists "
+            "(pass --overwrite to force creation)" % dst_dir)
+
+def _prepare_project_dir(project_dir, overwrite=False):
+    # NOTE: nothing to check in a missing or empty directory
+    if not _dir_nonempty(project_dir):
+        return
+
+    project_env_dir = osp.join(project_dir, DEFAULT_CONFIG.env_dir)
+    if _dir_nonempty(project_env_dir):
+        if not overwrite:
+            raise CliException("Directory '%s' already exists "
+                "(pass --overwrite to force creation)" % project_env_dir)
+        else:
+            _rmtree(project_env_dir, ignore_errors=True)
+
+    own_dataset_dir = osp.join(project_dir, DEFAULT_CONFIG.dataset_dir)
+    if _dir_nonempty(own_dataset_dir):
+        if not overwrite:
+            raise CliException("Directory '%s' already exists "
+                "(pass --overwrite to force creation)" % own_dataset_dir)
+        else:
+            # NOTE: remove the dir to avoid using data from previous project
+            _rmtree(own_dataset_dir)
+
 def build_create_parser(parser_ctor=argparse.ArgumentParser):
-    parser = parser_ctor(help="Create empty project",
+    parser = parser_ctor(
         description="""
             Create a new empty project.|n
             |n
@@ -47,43 +101,32 @@ def build_create_parser(parser_ctor=argparse.ArgumentParser):
     return parser
 
 def create_command(args):
-    project_dir = osp.abspath(args.dst_dir)
+    from datumaro.components.project import Project
 
-    project_env_dir = osp.join(project_dir, DEFAULT_CONFIG.env_dir)
-    if osp.isdir(project_env_dir) and os.listdir(project_env_dir):
-        if not args.overwrite:
-            raise CliException("Directory '%s' already exists "
-                "(pass --overwrite to force creation)" % project_env_dir)
-        else:
-            shutil.rmtree(project_env_dir, ignore_errors=True)
+    project_dir = osp.abspath(args.dst_dir)
 
-    own_dataset_dir = osp.join(project_dir, DEFAULT_CONFIG.dataset_dir)
-    if osp.isdir(own_dataset_dir) and os.listdir(own_dataset_dir):
-        if not args.overwrite:
-            raise CliException("Directory '%s' already exists "
-                "(pass --overwrite to force creation)" % own_dataset_dir)
-        else:
-            # NOTE: remove the dir to avoid using data from previous project
-            shutil.rmtree(own_dataset_dir)
+    _prepare_project_dir(project_dir, overwrite=args.overwrite)
 
     project_name = args.name
     if project_name is None:
         project_name = osp.basename(project_dir)
 
-    log.info("Creating project at '%s'" % project_dir)
+    log.info("Creating project at '%s'", project_dir)
 
     Project.generate(project_dir, {
         'project_name': project_name,
     })
 
-    log.info("Project has been created at '%s'" % project_dir)
+    log.info("Project has been created at '%s'", project_dir)
 
     return 0
 
-def build_import_parser(parser_ctor=argparse.ArgumentParser):
-    builtins = sorted(Environment().importers.items)
+def _list_builtin_importers():
+    from datumaro.components.project import Environment
+    return ', '.join(sorted(Environment().importers.items))
 
-    parser = parser_ctor(help="Create project from existing dataset",
+def build_import_parser(parser_ctor=argparse.ArgumentParser):
+    parser = parser_ctor(
         description="""
             Creates a project from an existing dataset. The source can be:|n
             - a dataset in a supported format (check 'formats' section below)|n
@@ -109,7 +152,7 @@ def build_import_parser(parser_ctor=argparse.ArgumentParser):
             <project_dir>/.datumaro/extractors
             and <project_dir>/.datumaro/importers.|n
             |n
-            List of builtin dataset formats: %s|n
+            List of builtin dataset formats: {formats}|n
             |n
             Examples:|n
             - Create a project from VOC dataset in the current directory:|n
@@ -117,8 +160,9 @@ def build_import_parser(parser_ctor=argparse.ArgumentParser):
             |n
             - Create a project from COCO dataset in other directory:|n
             |s|simport -f coco -i path/to/coco -o path/I/like/
-        """ % ', '.join(builtins),
-        formatter_class=MultilineFormatter)
+        """,
+        formatter_class=MultilineFormatter.with_lazy_sections(
+            formats=_list_builtin_importers))
 
     parser.add_argument('-o', '--output-dir', default='.', dest='dst_dir',
         help="Directory to save the new project to (default: current dir)")
@@ -134,31 +178,18 @@ def build_import_parser(parser_ctor=argparse.ArgumentParser):
         help="Path to import project from")
     parser.add_argument('-f', '--format', required=True,
         help="Source project format")
-    parser.add_argument('extra_args', nargs=argparse.REMAINDER,
+    parser.add_argument('extra_args', nargs='*',
         help="Additional arguments for importer (pass '-- -h' for help)")
     parser.set_defaults(command=import_command)
 
     return parser
 
 def import_command(args):
-    project_dir = osp.abspath(args.dst_dir)
+    from datumaro.components.project import Environment
 
-    project_env_dir = osp.join(project_dir, DEFAULT_CONFIG.env_dir)
-    if osp.isdir(project_env_dir) and os.listdir(project_env_dir):
-        if not args.overwrite:
-            raise CliException("Directory '%s' already exists "
-                "(pass --overwrite to force creation)" % project_env_dir)
-        else:
-            shutil.rmtree(project_env_dir, ignore_errors=True)
+    project_dir = osp.abspath(args.dst_dir)
 
-    own_dataset_dir = osp.join(project_dir, DEFAULT_CONFIG.dataset_dir)
-    if osp.isdir(own_dataset_dir) and os.listdir(own_dataset_dir):
-        if not args.overwrite:
-            raise CliException("Directory '%s' already exists "
-                "(pass --overwrite to force creation)" % own_dataset_dir)
-        else:
-            # NOTE: remove the dir to avoid using data from previous project
-            shutil.rmtree(own_dataset_dir)
+    _prepare_project_dir(project_dir, overwrite=args.overwrite)
 
     project_name = args.name
     if project_name is None:
@@ -175,28 +206,42 @@ def import_command(args):
     if hasattr(importer, 'from_cmdline'):
         extra_args = importer.from_cmdline(args.extra_args)
 
-    log.info("Importing project from '%s' as '%s'" % \
-        (args.source, args.format))
+    log.info("Importing project from '%s' as '%s'",
+        args.source, args.format)
 
     source = osp.abspath(args.source)
     project = importer(source, **extra_args)
     project.config.project_name = project_name
     project.config.project_dir = project_dir
 
-    if not args.skip_check or args.copy:
+    if args.copy:
         log.info("Checking the dataset...")
         dataset = project.make_dataset()
-    if args.copy:
         log.info("Cloning data...")
         dataset.save(merge=True, save_images=True)
     else:
+        if not args.skip_check:
+            # NOTE: the dataset is only built to verify the sources
+            log.info("Checking the dataset...")
+            project.make_dataset()
         project.save()
 
-    log.info("Project has been created at '%s'" % project_dir)
+    log.info("Project has been created at '%s'", project_dir)
 
     return 0
 
 
+def _compile_filter(filter_expr):
+    if not filter_expr:
+        return filter_expr
+
+    from lxml import etree as ET
+    try:
+        return ET.XPath(filter_expr)
+    except ET.XPathSyntaxError as e:
+        raise CliException("Invalid filter expression '%s': %s" % \
+            (filter_expr, e))
+
 class FilterModes(Enum):
     # primary
     items = 1
@@ -236,10 +281,12 @@ class FilterModes(Enum):
     def list_options(cls):
         return [m.name.replace('_', '+') for m in cls]
 
-def build_export_parser(parser_ctor=argparse.ArgumentParser):
-    builtins = sorted(Environment().converters.items)
+def _list_builtin_converters():
+    from datumaro.components.project import Environment
+    return ', '.join(sorted(Environment().converters.items))
 
-    parser = parser_ctor(help="Export project",
+def build_export_parser(parser_ctor=argparse.ArgumentParser):
+    parser = parser_ctor(
         description="""
             Exports the project dataset in some format. Optionally, a filter
             can be passed, check 'extract' command description for more info.
@@ -256,7 +303,7 @@ def build_export_parser(parser_ctor=argparse.ArgumentParser):
             To do this, you need to put a Converter
             definition script to <project_dir>/.datumaro/converters.|n
             |n
-            List of builtin dataset formats: %s|n
+            List of builtin dataset formats: {formats}|n
             |n
             Examples:|n
             - Export project as a VOC-like dataset, include images:|n
@@ -264,8 +311,9 @@ def build_export_parser(parser_ctor=argparse.ArgumentParser):
             |n
             - Export project as a COCO-like dataset in other directory:|n
             |s|sexport -f coco -o path/I/like/
-        """ % ', '.join(builtins),
-        formatter_class=MultilineFormatter)
+        """,
+        formatter_class=MultilineFormatter.with_lazy_sections(
+            formats=_list_builtin_converters))
 
     parser.add_argument('-e', '--filter', default=None,
         help="Filter expression for dataset items")
@@ -281,7 +329,7 @@ def build_export_parser(parser_ctor=argparse.ArgumentParser):
         help="Directory of the project to operate on (default: current dir)")
     parser.add_argument('-f', '--format', required=True,
         help="Output format")
-    parser.add_argument('extra_args', nargs=argparse.REMAINDER, default=None,
+    parser.add_argument('extra_args', nargs='*', default=None,
         help="Additional arguments for converter (pass '-- -h' for help)")
     parser.set_defaults(command=export_command)
 
@@ -292,9 +340,7 @@ def export_command(args):
 
     dst_dir = args.dst_dir
     if dst_dir:
-        if not args.overwrite and osp.isdir(dst_dir) and os.listdir(dst_dir):
-            raise CliException("Directory '%s' already exists "
-                "(pass --overwrite to force creation)" % dst_dir)
+        _check_dst_dir(dst_dir, overwrite=args.overwrite)
     else:
         dst_dir = generate_next_dir_name('%s-%s' % \
             (project.config.project_name, make_file_name(args.format)))
@@ -310,6 +356,7 @@ def export_command(args):
         extra_args = converter.from_cmdline(args.extra_args)
         converter = converter(**extra_args)
 
+    filter_expr = _compile_filter(args.filter)
     filter_args = FilterModes.make_filter_args(args.filter_mode)
 
     log.info("Loading the project...")
@@ -319,15 +366,15 @@ def export_command(args):
     dataset.export_project(
         save_dir=dst_dir,
         converter=converter,
-        filter_expr=args.filter,
+        filter_expr=filter_expr,
         **filter_args)
-    log.info("Project exported to '%s' as '%s'" % \
-        (dst_dir, args.format))
+    log.info("Project exported to '%s' as '%s'",
+        dst_dir, args.format)
 
     return 0
 
 def build_extract_parser(parser_ctor=argparse.ArgumentParser):
-    parser = parser_ctor(help="Extract subproject",
+    parser = parser_ctor(
         description="""
             Extracts a subproject that contains only items matching filter.
             A filter is an XPath expression, which is applied to XML
@@ -383,44 +430,50 @@ def build_extract_parser(parser_ctor=argparse.ArgumentParser):
     return parser
 
 def extract_command(args):
+    from datumaro.components.dataset_filter import DatasetItemEncoder
+
     project = load_project(args.project_dir)
 
     if not args.dry_run:
         dst_dir = args.dst_dir
         if dst_dir:
-            if not args.overwrite and osp.isdir(dst_dir) and os.listdir(dst_dir):
-                raise CliException("Directory '%s' already exists "
-                    "(pass --overwrite to force creation)" % dst_dir)
+            _check_dst_dir(dst_dir, overwrite=args.overwrite)
         else:
             dst_dir = generate_next_dir_name('%s-filter' % \
                 project.config.project_name)
         dst_dir = osp.abspath(dst_dir)
 
-    dataset = project.make_dataset()
-
+    filter_expr = _compile_filter(args.filter)
     filter_args = FilterModes.make_filter_args(args.mode)
 
+    dataset = project.make_dataset()
+
     if args.dry_run:
-        dataset = dataset.extract(filter_expr=args.filter, **filter_args)
+        dataset = dataset.extract(filter_expr=filter_expr, **filter_args)
+        categories = dataset.categories()
+        encode = DatasetItemEncoder.encode
+        to_string = DatasetItemEncoder.to_string
+        write = sys.stdout.write # stdout is buffered, avoid print() overhead
         for item in dataset:
-            encoded_item = DatasetItemEncoder.encode(item, dataset.categories())
-            xml_item = DatasetItemEncoder.to_string(encoded_item)
-            print(xml_item)
+            xml_item = to_string(encode(item, categories))
+            write(xml_item)
+            write('\n')
+        sys.stdout.flush()
         return 0
 
     if not args.filter:
         raise CliException("Expected a filter expression ('-e' argument)")
 
-    os.makedirs(dst_dir, exist_ok=False)
-    dataset.extract_project(save_dir=dst_dir, filter_expr=args.filter,
+    os.makedirs(dst_dir, exist_ok=True)
+    dataset.extract_project(save_dir=dst_dir, filter_expr=filter_expr,
         **filter_args)
 
-    log.info("Subproject has been extracted to '%s'" % dst_dir)
+    log.info("Subproject has been extracted to '%s'", dst_dir)
 
     return 0
 
 def build_merge_parser(parser_ctor=argparse.ArgumentParser):
-    parser = parser_ctor(help="Merge projects",
+    parser = parser_ctor(
         description="""
             Updates items of the current project with items
             from the other project.|n
@@ -449,9 +502,7 @@ def merge_command(args):
 
     dst_dir = args.dst_dir
     if dst_dir:
-        if not args.overwrite and osp.isdir(dst_dir) and os.listdir(dst_dir):
-            raise CliException("Directory '%s' already exists "
-                "(pass --overwrite to force creation)" % dst_dir)
+        _check_dst_dir(dst_dir, overwrite=args.overwrite)
 
     first_dataset = first_project.make_dataset()
     first_dataset.update(second_project.make_dataset())
@@ -461,12 +512,15 @@ def merge_command(args):
     if dst_dir is None:
         dst_dir = first_project.config.project_dir
     dst_dir = osp.abspath(dst_dir)
-    log.info("Merge results have been saved to '%s'" % dst_dir)
+    log.info("Merge results have been saved to '%s'", dst_dir)
 
     return 0
 
 def build_diff_parser(parser_ctor=argparse.ArgumentParser):
-    parser = parser_ctor(help="Compare projects",
+    # NOTE: the parser is only built when the command is invoked
+    from .diff import DiffVisualizer
+
+    parser = parser_ctor(
         description="""
         Compares two projects.|n
         |n
@@ -482,7 +536,7 @@ def build_diff_parser(parser_ctor=argparse.ArgumentParser):
     parser.add_argument('-o', '--output-dir', dest='dst_dir', default=None,
         help="Directory to save comparison results (default: do not save)")
     parser.add_argument('-f', '--format',
-        default=DiffVisualizer.DEFAULT_FORMAT,
+        default=DiffVisualizer.DEFAULT_FORMAT.name,
         choices=[f.name for f in DiffVisualizer.Format],
         help="Output format (default: %(default)s)")
     parser.add_argument('--iou-thresh', default=0.5, type=float,
@@ -498,6 +552,9 @@ def build_diff_parser(parser_ctor=argparse.ArgumentParser):
     return parser
 
 def diff_command(args):
+    from datumaro.components.comparator import Comparator
+    from .diff import DiffVisualizer
+
     first_project = load_project(args.project_dir)
     second_project = load_project(args.other_project_dir)
 
@@ -507,16 +564,14 @@ def diff_command(args):
 
     dst_dir = args.dst_dir
     if dst_dir:
-        if not args.overwrite and osp.isdir(dst_dir) and os.listdir(dst_dir):
-            raise CliException("Directory '%s' already exists "
-                "(pass --overwrite to force creation)" % dst_dir)
+        _check_dst_dir(dst_dir, overwrite=args.overwrite)
     else:
         dst_dir = generate_next_dir_name('%s-%s-diff' % (
             first_project.config.project_name,
             second_project.config.project_name)
         )
     dst_dir = osp.abspath(dst_dir)
-    log.info("Saving diff to '%s'" % dst_dir)
+    log.info("Saving diff to '%s'", dst_dir)
 
     visualizer = DiffVisualizer(save_dir=dst_dir, comparator=comparator,
         output_format=args.format)
@@ -526,21 +581,24 @@ def diff_command(args):
 
     return 0
 
-def build_transform_parser(parser_ctor=argparse.ArgumentParser):
-    builtins = sorted(Environment().transforms.items)
+def _list_builtin_transforms():
+    from datumaro.components.project import Environment
+    return ', '.join(sorted(Environment().transforms.items))
 
-    parser = parser_ctor(help="Transform project",
+def build_transform_parser(parser_ctor=argparse.ArgumentParser):
+    parser = parser_ctor(
         description="""
             Applies some operation to dataset items in the project
             and produces a new project.|n
             |n
-            Builtin transforms: %s|n
+            Builtin transforms: {transforms}|n
             |n
             Examples:|n
             - Convert instance polygons to masks:|n
             |s|stransform -n polygons_to_masks
-        """ % ', '.join(builtins),
-        formatter_class=MultilineFormatter)
+        """,
+        formatter_class=MultilineFormatter.with_lazy_sections(
+            transforms=_list_builtin_transforms))
 
     parser.add_argument('-t', '--transform', required=True,
         help="Transform to apply to the project")
@@ -550,7 +608,7 @@ def build_transform_parser(parser_ctor=argparse.ArgumentParser):
         help="Overwrite existing files in the save directory")
     parser.add_argument('-p', '--project', dest='project_dir', default='.',
         help="Directory of the project to operate on (default: current dir)")
-    parser.add_argument('extra_args', nargs=argparse.REMAINDER, default=None,
+    parser.add_argument('extra_args', nargs='*', default=None,
         help="Additional arguments for transformation (pass '-- -h' for help)")
     parser.set_defaults(command=transform_command)
 
@@ -561,9 +619,7 @@ def transform_command(args):
 
     dst_dir = args.dst_dir
     if dst_dir:
-        if not args.overwrite and osp.isdir(dst_dir) and os.listdir(dst_dir):
-            raise CliException("Directory '%s' already exists "
-                "(pass --overwrite to force creation)" % dst_dir)
+        _check_dst_dir(dst_dir, overwrite=args.overwrite)
     else:
         dst_dir = generate_next_dir_name('%s-%s' % \
             (project.config.project_name, make_file_name(args.transform)))
@@ -588,12 +644,12 @@ def transform_command(args):
         **extra_args
     )
 
-    log.info("Transform results have been saved to '%s'" % dst_dir)
+    log.info("Transform results have been saved to '%s'", dst_dir)
 
     return 0
 
 def build_info_parser(parser_ctor=argparse.ArgumentParser):
-    parser = parser_ctor(help="Get project info",
+    parser = parser_ctor(
         description="""
             Outputs project info.
         """,
@@ -608,6 +664,8 @@ def build_info_parser(parser_ctor=argparse.ArgumentParser):
     return parser
 
 def info_command(args):
+    from datumaro.components.extractor import AnnotationType
+
     project = load_project(args.project_dir)
     config = project.config
     env = project.env
@@ -678,14 +736,22 @@ def build_parser(parser_ctor=argparse.ArgumentParser):
         """,
         formatter_class=MultilineFormatter)
 
-    subparsers = parser.add_subparsers()
-    add_subparser(subparsers, 'create', build_create_parser)
-    add_subparser(subparsers, 'import', build_import_parser)
-    add_subparser(subparsers, 'export', build_export_parser)
-    add_subparser(subparsers, 'extract', build_extract_parser)
-    add_subparser(subparsers, 'merge', build_merge_parser)
-    add_subparser(subparsers, 'diff', build_diff_parser)
-    add_subparser(subparsers, 'transform', build_transform_parser)
-    add_subparser(subparsers, 'info', build_info_parser)
+    # NOTE: only the invoked subcommand parser is built, the others
+    # are represented by their help lines, which are defined only here
+    known_commands = [
+        ('create', build_create_parser, "Create empty project"),
+        ('import', build_import_parser, "Create project from existing dataset"),
+        ('export', build_export_parser, "Export project"),
+        ('extract', build_extract_parser, "Extract subproject"),
+        ('merge', build_merge_parser, "Merge projects"),
+        ('diff', build_diff_parser, "Compare projects"),
+        ('transform', build_transform_parser, "Transform project"),
+        ('info', build_info_parser, "Get project info"),
+    ]
+
+    subparsers = parser.add_subparsers(action=LazySubparsersAction)
+    for command_name, command_builder, command_help in known_commands:
+        add_lazy_subparser(subparsers, command_name, command_builder,
+            help=command_help)
 
     return parser
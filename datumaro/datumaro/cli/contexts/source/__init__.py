@@ -9,14 +9,15 @@ import os
 import os.path as osp
 import shutil
 
-from datumaro.components.project import Environment
 from ...util import add_subparser, CliException, MultilineFormatter
 from ...util.project import load_project
 
 
-def build_add_parser(parser_ctor=argparse.ArgumentParser):
-    builtins = sorted(Environment().extractors.items)
+def _list_builtin_extractors():
+    from datumaro.components.project import Environment
+    return ', '.join(sorted(Environment().extractors.items))
 
+def build_add_parser(parser_ctor=argparse.ArgumentParser):
     base_parser = argparse.ArgumentParser(add_help=False)
     base_parser.add_argument('-n', '--name', default=None,
         help="Name of the new source")
@@ -36,7 +37,7 @@ def build_add_parser(parser_ctor=argparse.ArgumentParser):
             The source can be either a local directory or a remote
             git repository. Each source type has its own parameters, which can
             be checked by:|n
-            '%s'.|n
+            '%(prog)s SOURCE_TYPE --help'.|n
             |n
             Formats:|n
             Datasets come in a wide variety of formats. Each dataset
@@ -53,7 +54,7 @@ def build_add_parser(parser_ctor=argparse.ArgumentParser):
             To do this, you need to put an Extractor
             definition script to <project_dir>/.datumaro/extractors.|n
             |n
-            List of builtin source formats: %s|n
+            List of builtin source formats: {formats}|n
             |n
             Examples:|n
             - Add a local directory with VOC-like dataset:|n
@@ -61,8 +62,9 @@ def build_add_parser(parser_ctor=argparse.ArgumentParser):
             - Add a local file with CVAT annotations, call it 'mysource'|n
             |s|s|s|sto the project somewhere else:|n
             |s|sadd path path/to/cvat.xml -f cvat -n mysource -p somewhere/else/
-        """ % ('%(prog)s SOURCE_TYPE --help', ', '.join(builtins)),
-        formatter_class=MultilineFormatter,
+        """,
+        formatter_class=MultilineFormatter.with_lazy_sections(
+            formats=_list_builtin_extractors),
         add_help=False)
     parser.set_defaults(command=add_command)
 
@@ -91,7 +93,8 @@ def build_add_parser(parser_ctor=argparse.ArgumentParser):
     display_parser = argparse.ArgumentParser(
         parents=[base_parser, parser],
         prog=parser.prog, usage="%(prog)s [-h] SOURCE_TYPE ...",
-        description=parser.description, formatter_class=MultilineFormatter)
+        description=parser.description,
+        formatter_class=parser.formatter_class)
     class HelpAction(argparse._HelpAction):
         def __call__(self, parser, namespace, values, option_string=None):
             display_parser.print_help()
@@ -4,6 +4,7 @@
 # SPDX-License-Identifier: MIT
 
 import argparse
+from functools import partial
 import textwrap
 
 
@@ -12,15 +13,68 @@ class CliException(Exception): pass
 def add_subparser(subparsers, name, builder):
     return builder(lambda **kwargs: subparsers.add_parser(name, **kwargs))
 
+class LazySubparsersAction(argparse._SubParsersAction):
+    """
+    Defers building of a subcommand parser until the subcommand is invoked.
+    Until then, only a stub parser with a help line is registered, which
+    is enough for the command list and for invalid choice errors.
+    The help line is taken from add_lazy_parser() arguments, a 'help'
+    argument passed by the builder is ignored.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._builders = {}
+
+    def add_lazy_parser(self, name, builder, **kwargs):
+        parser = self.add_parser(name, **kwargs)
+        self._builders[name] = builder
+        return parser
+
+    def _build_parser(self, name):
+        builder = self._builders.pop(name, None)
+        if builder is None:
+            return
+
+        def _make_parser(**kwargs):
+            kwargs.pop('help', None)
+            kwargs.setdefault('prog', '%s %s' % (self._prog_prefix, name))
+            parser = self._parser_class(**kwargs)
+            self._name_parser_map[name] = parser
+            return parser
+        builder(_make_parser)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        self._build_parser(values[0])
+        super().__call__(parser, namespace, values, option_string)
+
+def add_lazy_subparser(subparsers, name, builder, **kwargs):
+    return subparsers.add_lazy_parser(name, builder, **kwargs)
+
 class MultilineFormatter(argparse.HelpFormatter):
     """
     Keeps line breaks introduced with '|n' separator
     and spaces introduced with '|s'.
+    Replaces '{name}' markers with the text produced by the corresponding
+    callable from 'lazy_sections'. The callables are only invoked
+    when the help is actually formatted.
     """
 
-    def __init__(self, keep_natural=False, **kwargs):
+    def __init__(self, keep_natural=False, lazy_sections=None, **kwargs):
         super().__init__(**kwargs)
         self._keep_natural = keep_natural
+        self._lazy_sections = lazy_sections or {}
+
+    @classmethod
+    def with_lazy_sections(cls, **lazy_sections):
+        return partial(cls, lazy_sections=lazy_sections)
+
+    def _format_text(self, text):
+        for name, make_text in self._lazy_sections.items():
+            marker = '{%s}' % name
+            if marker in text:
+                text = text.replace(marker, make_text())
+        return super()._format_text(text)
 
     def _fill_text(self, text, width, indent):
         text = self._whitespace_matcher.sub(' ', text).strip()
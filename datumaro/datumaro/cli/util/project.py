@@ -5,10 +5,9 @@
 
 import os
 
-from datumaro.components.project import Project
-
 
 def load_project(project_dir):
+    from datumaro.components.project import Project
     return Project.load(project_dir)
 
 def generate_next_dir_name(dirname, basedir='.', sep='.'):
@@ -4,6 +4,7 @@
 # SPDX-License-Identifier: MIT
 
 import argparse
+from functools import lru_cache
 
 from datumaro.cli.util import MultilineFormatter
 
@@ -11,8 +12,9 @@ from datumaro.cli.util import MultilineFormatter
 class CliPlugin:
     @staticmethod
     def _get_name(cls):
-        return getattr(cls, 'NAME',
-            remove_plugin_type(to_snake_case(cls.__name__)))
+        if hasattr(cls, 'NAME'):
+            return cls.NAME
+        return make_plugin_name(cls.__name__)
 
     @staticmethod
     def _get_doc(cls):
@@ -37,6 +39,12 @@ class CliPlugin:
         args = parser.parse_args(args)
         return vars(args)
 
+# NOTE: plugin names are resolved for every plugin each time
+# an Environment is created, which happens for every Project
+@lru_cache(maxsize=None)
+def make_plugin_name(class_name):
+    return remove_plugin_type(to_snake_case(class_name))
+
 def remove_plugin_type(s):
     for t in {'transform', 'extractor', 'converter', 'launcher', 'importer'}:
         s = s.replace('_' + t, '')
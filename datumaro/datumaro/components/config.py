@@ -3,6 +3,8 @@
 #
 # SPDX-License-Identifier: MIT
 
+from copy import deepcopy
+from functools import lru_cache
 import yaml
 
 
@@ -209,6 +211,17 @@ class Config:
         with open(path, 'r') as f:
             return Config(yaml.safe_load(f))
 
+    @staticmethod
+    def parse_cached(path):
+        """
+        Same as parse(), but reuses the parsed data for the same
+        file contents. Each call returns a new Config object.
+        """
+
+        with open(path, 'r') as f:
+            text = f.read()
+        return Config(deepcopy(_parse_yaml_text(text)))
+
     @staticmethod
     def yaml_representer(dumper, value):
         return dumper.represent_data(
@@ -220,6 +233,11 @@ class Config:
 
 yaml.add_multi_representer(Config, Config.yaml_representer)
 
+# NOTE: keyed on the text itself, so any change of the file is noticed
+@lru_cache(maxsize=8)
+def _parse_yaml_text(text):
+    return yaml.safe_load(text)
+
 
 class DefaultConfig(Config):
     def __init__(self, default=None):
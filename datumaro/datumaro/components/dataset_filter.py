@@ -210,7 +210,8 @@ class DatasetItemEncoder:
 def XPathDatasetFilter(extractor, xpath=None):
     if xpath is None:
         return extractor
-    xpath = ET.XPath(xpath)
+    if not isinstance(xpath, ET.XPath):
+        xpath = ET.XPath(xpath)
     f = lambda item: bool(xpath(
         DatasetItemEncoder.encode(item, extractor.categories())))
     return extractor.select(f)
@@ -219,7 +220,7 @@ class XPathAnnotationsFilter(Transform):
     def __init__(self, extractor, xpath=None, remove_empty=False):
         super().__init__(extractor)
 
-        if xpath is not None:
+        if xpath is not None and not isinstance(xpath, ET.XPath):
             xpath = ET.XPath(xpath)
         self._filter = xpath
 
@@ -706,7 +706,7 @@ class Project:
         path = osp.abspath(path)
         config_path = osp.join(path, PROJECT_DEFAULT_CONFIG.env_dir,
             PROJECT_DEFAULT_CONFIG.project_filename)
-        config = Config.parse(config_path)
+        config = Config.parse_cached(config_path)
         config.project_dir = path
         config.project_filename = osp.basename(config_path)
         return Project(config)
@@ -0,0 +1,64 @@
+import os
+import os.path as osp
+
+from unittest import TestCase
+
+from datumaro.cli.__main__ import make_parser
+from datumaro.cli.contexts.project import _check_dst_dir, _dir_nonempty
+from datumaro.cli.util import CliException
+from datumaro.components.project import Project
+from datumaro.util.test_utils import TestDir
+
+
+class DstDirCheckTest(TestCase):
+    def test_can_check_dir_is_nonempty(self):
+        with TestDir() as test_dir:
+            empty_dir = osp.join(test_dir, 'empty')
+            os.makedirs(empty_dir)
+            nonempty_dir = osp.join(test_dir, 'nonempty')
+            os.makedirs(osp.join(nonempty_dir, 'subdir'))
+            file_path = osp.join(test_dir, 'file')
+            open(file_path, 'w').close()
+
+            self.assertFalse(_dir_nonempty(empty_dir))
+            self.assertTrue(_dir_nonempty(nonempty_dir))
+            self.assertFalse(_dir_nonempty(file_path))
+            self.assertFalse(_dir_nonempty(osp.join(test_dir, 'missing')))
+
+    def test_can_check_dst_dir(self):
+        with TestDir() as test_dir:
+            empty_dir = osp.join(test_dir, 'empty')
+            os.makedirs(empty_dir)
+            nonempty_dir = osp.join(test_dir, 'nonempty')
+            os.makedirs(osp.join(nonempty_dir, 'subdir'))
+
+            _check_dst_dir(empty_dir)
+            _check_dst_dir(nonempty_dir, overwrite=True)
+            with self.assertRaises(CliException):
+                _check_dst_dir(nonempty_dir)
+
+class ExtractCommandTest(TestCase):
+    def _extract(self, *args):
+        args = make_parser().parse_args(['project', 'extract'] + list(args))
+        return args.command(args)
+
+    def test_can_extract_to_existing_empty_dir(self):
+        with TestDir() as test_dir:
+            project_dir = osp.join(test_dir, 'project')
+            Project.generate(project_dir)
+            dst_dir = osp.join(test_dir, 'dst')
+            os.makedirs(dst_dir)
+
+            self.assertEqual(0, self._extract('-p', project_dir,
+                '-e', '/item', '-o', dst_dir))
+            self.assertTrue(_dir_nonempty(dst_dir))
+
+    def test_can_extract_to_existing_dir_with_overwrite(self):
+        with TestDir() as test_dir:
+            project_dir = osp.join(test_dir, 'project')
+            Project.generate(project_dir)
+            dst_dir = osp.join(test_dir, 'dst')
+            os.makedirs(osp.join(dst_dir, 'subdir'))
+
+            self.assertEqual(0, self._extract('-p', project_dir,
+                '-e', '/item', '-o', dst_dir, '--overwrite'))
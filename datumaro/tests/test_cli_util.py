@@ -0,0 +1,71 @@
+from contextlib import redirect_stderr
+import argparse
+import io
+
+from unittest import TestCase
+
+from datumaro.cli.util import LazySubparsersAction, add_lazy_subparser
+
+
+class LazySubparsersTest(TestCase):
+    def _make_parser(self, built):
+        def make_builder(name):
+            def build_parser(parser_ctor=argparse.ArgumentParser):
+                built.append(name)
+                parser = parser_ctor(help="Full help of %s" % name)
+                parser.add_argument('--value', default=None)
+                parser.set_defaults(command=name)
+                return parser
+            return build_parser
+
+        parser = argparse.ArgumentParser(prog='test')
+        subparsers = parser.add_subparsers(action=LazySubparsersAction)
+        for name in ['first', 'second']:
+            add_lazy_subparser(subparsers, name, make_builder(name),
+                help="Stub help of %s" % name)
+        return parser
+
+    def test_only_dispatched_builder_is_called(self):
+        built = []
+        parser = self._make_parser(built)
+
+        args = parser.parse_args(['second', '--value', '5'])
+
+        self.assertEqual(['second'], built)
+        self.assertEqual('second', args.command)
+        self.assertEqual('5', args.value)
+
+    def test_stub_help_is_listed(self):
+        built = []
+        parser = self._make_parser(built)
+
+        help_text = parser.format_help()
+
+        self.assertIn("Stub help of first", help_text)
+        self.assertIn("Stub help of second", help_text)
+        self.assertEqual([], built)
+
+    def test_invalid_choice_is_reported(self):
+        built = []
+        parser = self._make_parser(built)
+
+        with redirect_stderr(io.StringIO()) as stderr, \
+                self.assertRaises(SystemExit) as exit_info:
+            parser.parse_args(['third'])
+
+        self.assertEqual(2, exit_info.exception.code)
+        self.assertIn("invalid choice", stderr.getvalue())
+        self.assertEqual([], built)
+
+    def test_can_parse_args_again(self):
+        built = []
+        parser = self._make_parser(built)
+
+        parser.parse_args(['first'])
+        args = parser.parse_args(['first', '--value', '1'])
+        other_args = parser.parse_args(['second'])
+
+        self.assertEqual(['first', 'second'], built)
+        self.assertEqual('first', args.command)
+        self.assertEqual('1', args.value)
+        self.assertEqual('second', other_args.command)
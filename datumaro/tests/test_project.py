@@ -1,3 +1,4 @@
+from lxml import etree as ET
 import numpy as np
 import os
 import os.path as osp
@@ -37,6 +38,31 @@ class ProjectTest(TestCase):
             self.assertEqual(
                 src_config.format_version, result_config.format_version)
 
+    def test_project_reload_returns_updated_config(self):
+        with TestDir() as test_dir:
+            Project.generate(test_dir, { 'project_name': 'first' })
+            project = Project.load(test_dir)
+            self.assertEqual('first', project.config.project_name)
+
+            # same file size, to avoid relying on file stats
+            project.config.project_name = 'other'
+            project.save()
+
+            self.assertEqual('other',
+                Project.load(test_dir).config.project_name)
+
+    def test_project_reload_is_not_affected_by_changes(self):
+        with TestDir() as test_dir:
+            Project.generate(test_dir, { 'project_name': 'first' })
+            project = Project.load(test_dir)
+
+            project.config.project_name = 'other'
+            project.add_source('source', { 'url': 'path' })
+
+            reloaded = Project.load(test_dir)
+            self.assertEqual('first', reloaded.config.project_name)
+            self.assertEqual(0, len(reloaded.config.sources))
+
     @staticmethod
     def test_default_ctor_is_ok():
         Project()
@@ -371,6 +397,18 @@ class DatasetFilterTest(TestCase):
 
         self.assertEqual(2, len(filtered))
 
+    def test_item_filter_can_be_applied_with_compiled_xpath(self):
+        class TestExtractor(Extractor):
+            def __iter__(self):
+                for i in range(4):
+                    yield DatasetItem(id=i, subset='train')
+
+        extractor = TestExtractor()
+
+        filtered = XPathDatasetFilter(extractor, ET.XPath('/item[id > 1]'))
+
+        self.assertEqual(2, len(filtered))
+
     def test_annotations_filter_can_be_applied(self):
         class SrcExtractor(Extractor):
             def __iter__(self):
@@ -405,6 +443,40 @@ class DatasetFilterTest(TestCase):
 
         self.assertListEqual(list(filtered), list(DstExtractor()))
 
+    def test_annotations_filter_can_be_applied_with_compiled_xpath(self):
+        class SrcExtractor(Extractor):
+            def __iter__(self):
+                return iter([
+                    DatasetItem(id=0),
+                    DatasetItem(id=1, annotations=[
+                        Label(0),
+                        Label(1),
+                    ]),
+                    DatasetItem(id=2, annotations=[
+                        Label(0),
+                        Label(2),
+                    ]),
+                ])
+
+        class DstExtractor(Extractor):
+            def __iter__(self):
+                return iter([
+                    DatasetItem(id=0),
+                    DatasetItem(id=1, annotations=[
+                        Label(0),
+                    ]),
+                    DatasetItem(id=2, annotations=[
+                        Label(0),
+                    ]),
+                ])
+
+        extractor = SrcExtractor()
+
+        filtered = XPathAnnotationsFilter(extractor,
+            ET.XPath('/item/annotation[label_id = 0]'))
+
+        self.assertListEqual(list(filtered), list(DstExtractor()))
+
     def test_annotations_filter_can_remove_empty_items(self):
         class SrcExtractor(Extractor):
             def __iter__(self):